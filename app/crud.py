@@ -1,108 +1,141 @@
 """CRUD operations for database models."""
 
-from datetime import datetime
+from collections.abc import AsyncIterator, Sequence
+from datetime import UTC, datetime
 
-from sqlalchemy.orm import Session
+from sqlalchemy import func, insert, lambda_stmt, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import Task, User
-from app.schemas import TaskCreate, TaskStatus, TaskUpdate, UserCreate
-from app.security import get_password_hash
+from app.schemas import TaskCreate, TaskStatus, TaskSummary, TaskUpdate, UserCreate
+from app.security import get_password_hash, run_password_hashing
 
 
 # User CRUD operations
-def create_user(db: Session, user: UserCreate) -> User:
+async def create_user(db: AsyncSession, user: UserCreate) -> User:
     """Create a new user."""
-    db_user = User(
-        username=user.username,
-        email=user.email,
-        hashed_password=get_password_hash(user.password),
+    # Password hashing is CPU-bound, keep it off the event loop
+    hashed_password = await run_password_hashing(get_password_hash, user.password)
+    db_user = await db.scalar(
+        insert(User)
+        .values(
+            username=user.username,
+            email=user.email,
+            hashed_password=hashed_password,
+        )
+        .returning(User)
     )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
     return db_user
 
 
-def get_user(db: Session, user_id: int) -> User | None:
+async def get_user(db: AsyncSession, user_id: int) -> User | None:
     """Get user by ID."""
-    return db.query(User).filter(User.id == user_id).first()
+    return await db.get(User, user_id)
 
 
-def get_user_by_username(db: Session, username: str) -> User | None:
+async def get_user_by_username(db: AsyncSession, username: str) -> User | None:
     """Get user by username."""
-    return db.query(User).filter(User.username == username).first()
+    stmt = lambda_stmt(lambda: select(User).where(User.username == username))
+    return await db.scalar(stmt)
 
 
-def get_user_by_email(db: Session, email: str) -> User | None:
+async def get_user_by_email(db: AsyncSession, email: str) -> User | None:
     """Get user by email."""
-    return db.query(User).filter(User.email == email).first()
+    stmt = lambda_stmt(lambda: select(User).where(User.email == email))
+    return await db.scalar(stmt)
 
 
 # Task CRUD operations
-def create_task(db: Session, user_id: int, task: TaskCreate) -> Task:
+async def create_task(db: AsyncSession, user_id: int, task: TaskCreate) -> Task:
     """Create a new task."""
-    db_task = Task(
-        user_id=user_id,
-        title=task.title,
-        description=task.description,
-        status=task.status,
-        priority=task.priority,
-        due_date=task.due_date,
+    db_task = await db.scalar(
+        insert(Task)
+        .values(
+            user_id=user_id,
+            title=task.title,
+            description=task.description,
+            status=task.status,
+            priority=task.priority,
+            due_date=task.due_date,
+        )
+        .returning(Task)
     )
-    db.add(db_task)
-    db.commit()
-    db.refresh(db_task)
+    await db.commit()
     return db_task
 
 
-def get_task(db: Session, task_id: int) -> Task | None:
-    """Get task by ID."""
-    return db.query(Task).filter(Task.id == task_id).first()
+async def get_task_for_user(db: AsyncSession, task_id: int, user_id: int) -> Task | None:
+    """Get task by ID if it belongs to the given user."""
+    stmt = lambda_stmt(lambda: select(Task).where(Task.id == task_id, Task.user_id == user_id))
+    return await db.scalar(stmt)
 
 
-def get_user_tasks(db: Session, user_id: int, status: TaskStatus | None = None) -> list[Task]:
-    """Get all tasks for a user, optionally filtered by status."""
-    query = db.query(Task).filter(Task.user_id == user_id)
+def _user_tasks_stmt(user_id: int, status: TaskStatus | None):
+    """Build the statement selecting a user's tasks, optionally filtered by status."""
+    stmt = lambda_stmt(lambda: select(Task).where(Task.user_id == user_id))
     if status:
-        query = query.filter(Task.status == status)
-    return query.all()
+        stmt += lambda s: s.where(Task.status == status)
+    return stmt
+
 
+async def get_user_tasks(
+    db: AsyncSession, user_id: int, status: TaskStatus | None = None
+) -> list[Task]:
+    """Get all tasks for a user, optionally filtered by status."""
+    result = await db.scalars(_user_tasks_stmt(user_id, status))
+    return result.all()
 
-def update_task(db: Session, task: Task, task_update: TaskUpdate) -> Task:
+
+async def stream_user_tasks(
+    db: AsyncSession, user_id: int, status: TaskStatus | None = None, batch_size: int = 200
+) -> AsyncIterator[Sequence[Task]]:
+    """Yield a user's tasks in batches from a server-side cursor."""
+    result = await db.stream_scalars(
+        _user_tasks_stmt(user_id, status), execution_options={"yield_per": batch_size}
+    )
+    async for batch in result.partitions():
+        yield batch
+
+
+async def update_task(db: AsyncSession, task: Task, task_update: TaskUpdate) -> Task:
     """Update a task."""
     update_data = task_update.model_dump(exclude_unset=True)
-    if "status" in update_data and update_data["status"] == TaskStatus.COMPLETED:
-        update_data["completed_at"] = datetime.utcnow()
-    elif "status" in update_data and update_data["status"] != TaskStatus.COMPLETED:
-        update_data["completed_at"] = None
+    if "status" in update_data:
+        completed = update_data["status"] is TaskStatus.COMPLETED
+        update_data["completed_at"] = datetime.now(UTC) if completed else None
 
     for field, value in update_data.items():
         setattr(task, field, value)
 
     db.add(task)
-    db.commit()
-    db.refresh(task)
+    await db.commit()
+    await db.refresh(task)
     return task
 
 
-def delete_task(db: Session, task: Task) -> None:
+async def delete_task(db: AsyncSession, task: Task) -> None:
     """Delete a task."""
-    db.delete(task)
-    db.commit()
+    await db.delete(task)
+    await db.commit()
 
 
-def get_task_summary(db: Session, user_id: int) -> dict:
+async def get_task_summary(db: AsyncSession, user_id: int) -> TaskSummary:
     """Get task summary for a user."""
-    tasks = get_user_tasks(db, user_id)
-    total = len(tasks)
-    completed = sum(1 for t in tasks if t.status == TaskStatus.COMPLETED)
-    in_progress = sum(1 for t in tasks if t.status == TaskStatus.IN_PROGRESS)
-    todo = sum(1 for t in tasks if t.status == TaskStatus.TODO)
-
-    return {
-        "total_tasks": total,
-        "completed_tasks": completed,
-        "in_progress_tasks": in_progress,
-        "todo_tasks": todo,
-        "completion_rate": (completed / total * 100) if total > 0 else 0,
-    }
+    result = await db.execute(
+        select(Task.status, func.count()).where(Task.user_id == user_id).group_by(Task.status)
+    )
+    counts = dict(result.all())
+    total = sum(counts.values())
+    completed = counts.get(TaskStatus.COMPLETED, 0)
+    in_progress = counts.get(TaskStatus.IN_PROGRESS, 0)
+    todo = counts.get(TaskStatus.TODO, 0)
+
+    # Counts are computed server-side, so skip re-validating them
+    return TaskSummary.model_construct(
+        total_tasks=total,
+        completed_tasks=completed,
+        in_progress_tasks=in_progress,
+        todo_tasks=todo,
+        completion_rate=(completed / total * 100) if total > 0 else 0.0,
+    )
@@ -2,15 +2,17 @@
 
 import os
 from contextlib import asynccontextmanager
-from datetime import datetime, timedelta
+from datetime import UTC, datetime, timedelta
 
 from fastapi import Depends, FastAPI, HTTPException, Query, status
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import __version__, crud
 from app.config import settings
 from app.database import Base, engine, get_db
+from app.responses import MsgspecJSONResponse, stream_tasks_json, task_to_struct
 from app.schemas import (
     HealthResponse,
     TaskCreate,
@@ -19,12 +21,17 @@ from app.schemas import (
     TaskSummary,
     TaskUpdate,
     Token,
-    TokenData,
     UserCreate,
     UserResponse,
     VersionResponse,
 )
-from app.security import create_access_token, get_current_user, verify_password
+from app.security import (
+    CurrentUser,
+    create_access_token,
+    get_current_user,
+    run_password_hashing,
+    verify_password,
+)
 
 
 @asynccontextmanager
@@ -32,7 +39,8 @@ async def lifespan(app: FastAPI):
     """Application lifespan - create database tables on startup."""
     # Skip table creation during testing (tests handle their own setup)
     if os.environ.get("TESTING") != "1":
-        Base.metadata.create_all(bind=engine)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
     yield
 
 
@@ -42,6 +50,7 @@ app = FastAPI(
     description="Advanced DevOps CI/CD for a Containerized Python Service - To-Do API",
     version=__version__,
     lifespan=lifespan,
+    default_response_class=MsgspecJSONResponse,
 )
 
 # Add CORS middleware
@@ -54,21 +63,21 @@ app.add_middleware(
 )
 
 
+# Invariant part of the /version payload, built once at import
+VERSION_INFO = {"version": __version__, "app_name": settings.app_name}
+
+
 # Health and Version endpoints
 @app.get("/health", response_model=HealthResponse, tags=["Health"])
 async def health_check():
     """Health check endpoint."""
-    return HealthResponse(status="healthy", timestamp=datetime.utcnow())
+    return MsgspecJSONResponse({"status": "healthy", "timestamp": datetime.now(UTC)})
 
 
 @app.get("/version", response_model=VersionResponse, tags=["Health"])
 async def version():
     """Version endpoint."""
-    return VersionResponse(
-        version=__version__,
-        app_name=settings.app_name,
-        timestamp=datetime.utcnow(),
-    )
+    return MsgspecJSONResponse({**VERSION_INFO, "timestamp": datetime.now(UTC)})
 
 
 # Authentication endpoints
@@ -78,31 +87,31 @@ async def version():
     status_code=status.HTTP_201_CREATED,
     tags=["Auth"],
 )
-async def register(user: UserCreate, db: Session = Depends(get_db)):
+async def register(user: UserCreate, db: AsyncSession = Depends(get_db)):
     """Register a new user."""
     # Check if user already exists
-    db_user = crud.get_user_by_username(db, user.username)
+    db_user = await crud.get_user_by_username(db, user.username)
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already registered",
         )
 
-    db_user = crud.get_user_by_email(db, user.email)
+    db_user = await crud.get_user_by_email(db, user.email)
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered",
         )
 
-    return crud.create_user(db, user)
+    return await crud.create_user(db, user)
 
 
 @app.post("/auth/login", response_model=Token, tags=["Auth"])
-async def login(username: str, password: str, db: Session = Depends(get_db)):
+async def login(username: str, password: str, db: AsyncSession = Depends(get_db)):
     """Login and get access token."""
-    user = crud.get_user_by_username(db, username)
-    if not user or not verify_password(password, user.hashed_password):
+    user = await crud.get_user_by_username(db, username)
+    if not user or not await run_password_hashing(verify_password, password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -111,7 +120,7 @@ async def login(username: str, password: str, db: Session = Depends(get_db)):
 
     access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
     access_token = create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
+        data={"sub": user.username, "uid": user.id}, expires_delta=access_token_expires
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
@@ -122,112 +131,95 @@ async def login(username: str, password: str, db: Session = Depends(get_db)):
 )
 async def create_task(
     task: TaskCreate,
-    current_user: TokenData = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
 ):
     """Create a new task."""
-    user = crud.get_user_by_username(db, current_user.username)
-    if not user:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-
-    return crud.create_task(db, user.id, task)
+    db_task = await crud.create_task(db, current_user.id, task)
+    # Encode like the read endpoints so timestamps serialize identically
+    return MsgspecJSONResponse(task_to_struct(db_task), status_code=status.HTTP_201_CREATED)
 
 
 @app.get("/tasks", response_model=list[TaskResponse], tags=["Tasks"])
 async def list_tasks(
     status: TaskStatus | None = Query(None, description="Filter by task status"),
-    current_user: TokenData = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
 ):
     """List all tasks for the current user."""
-    user = crud.get_user_by_username(db, current_user.username)
-    if not user:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-
-    return crud.get_user_tasks(db, user.id, status)
+    # Rows are fetched and encoded while the body streams. The session from
+    # get_db stays open until the response has been sent (FastAPI < 0.106).
+    batches = crud.stream_user_tasks(db, current_user.id, status)
+    return StreamingResponse(stream_tasks_json(batches), media_type="application/json")
 
 
 @app.get("/tasks/{task_id}", response_model=TaskResponse, tags=["Tasks"])
 async def get_task(
     task_id: int,
-    current_user: TokenData = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
 ):
     """Get a specific task."""
-    task = crud.get_task(db, task_id)
+    task = await crud.get_task_for_user(db, task_id, current_user.id)
     if not task:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
 
-    # Verify ownership
-    user = crud.get_user_by_username(db, current_user.username)
-    if task.user_id != user.id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
-
-    return task
+    return MsgspecJSONResponse(task_to_struct(task))
 
 
 @app.put("/tasks/{task_id}", response_model=TaskResponse, tags=["Tasks"])
 async def update_task(
     task_id: int,
     task_update: TaskUpdate,
-    current_user: TokenData = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
 ):
     """Update a task."""
-    task = crud.get_task(db, task_id)
+    task = await crud.get_task_for_user(db, task_id, current_user.id)
     if not task:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
 
-    # Verify ownership
-    user = crud.get_user_by_username(db, current_user.username)
-    if task.user_id != user.id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
-
-    return crud.update_task(db, task, task_update)
+    task = await crud.update_task(db, task, task_update)
+    return MsgspecJSONResponse(task_to_struct(task))
 
 
 @app.delete("/tasks/{task_id}", status_code=status.HTTP_204_NO_CONTENT, tags=["Tasks"])
 async def delete_task(
     task_id: int,
-    current_user: TokenData = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
 ):
     """Delete a task."""
-    task = crud.get_task(db, task_id)
+    task = await crud.get_task_for_user(db, task_id, current_user.id)
     if not task:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
 
-    # Verify ownership
-    user = crud.get_user_by_username(db, current_user.username)
-    if task.user_id != user.id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
-
-    crud.delete_task(db, task)
+    await crud.delete_task(db, task)
     return None
 
 
-@app.get("/tasks/summary/stats", response_model=TaskSummary, tags=["Tasks"])
+@app.get(
+    "/tasks/summary/stats",
+    response_model=None,
+    responses={status.HTTP_200_OK: {"model": TaskSummary}},
+    tags=["Tasks"],
+)
 async def get_task_summary(
-    current_user: TokenData = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
 ):
     """Get task summary and statistics."""
-    user = crud.get_user_by_username(db, current_user.username)
-    if not user:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-
-    summary = crud.get_task_summary(db, user.id)
-    return TaskSummary(**summary)
+    return await crud.get_task_summary(db, current_user.id)
 
 
 # User endpoints
 @app.get("/users/me", response_model=UserResponse, tags=["Users"])
 async def get_current_user_info(
-    current_user: TokenData = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
 ):
     """Get current user information."""
-    user = crud.get_user_by_username(db, current_user.username)
+    user = await crud.get_user(db, current_user.id)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
@@ -237,4 +229,11 @@ async def get_current_user_info(
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run(
+        "app.main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.environ.get("WEB_CONCURRENCY", os.cpu_count() or 1)),
+    )
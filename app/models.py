@@ -1,6 +1,7 @@
 """Database models."""
 
-from sqlalchemy import Boolean, Column, DateTime, Enum, Integer, String, Text
+from sqlalchemy import Boolean, Column, DateTime, Enum, Index, Integer, String, Text
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from app.database import Base
@@ -20,17 +21,28 @@ class User(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
+    # Never lazy-loaded: accessing user.tasks without eager loading raises, which
+    # stops the per-user N+1 query pattern. Load it explicitly when needed, e.g.
+    # select(User).options(selectinload(User.tasks)), or query Task by user_id.
+    tasks = relationship(
+        "Task",
+        primaryjoin="User.id == foreign(Task.user_id)",
+        lazy="raise",
+        viewonly=True,
+    )
+
 
 class Task(Base):
     """Task model."""
 
     __tablename__ = "tasks"
+    __table_args__ = (Index("ix_tasks_user_status", "user_id", "status"),)
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, nullable=False, index=True)
     title = Column(String(255), nullable=False, index=True)
     description = Column(Text, nullable=True)
-    status = Column(Enum(TaskStatus), default=TaskStatus.TODO, index=True)
+    status = Column(Enum(TaskStatus), default=TaskStatus.TODO)
     priority = Column(Enum(TaskPriority), default=TaskPriority.MEDIUM)
     due_date = Column(DateTime(timezone=True), nullable=True)
     completed_at = Column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,50 @@
+"""Fast JSON responses encoded with msgspec."""
+
+from collections.abc import AsyncIterator, Sequence
+from datetime import datetime
+from typing import Any
+
+import msgspec
+from fastapi.responses import JSONResponse
+
+from app.models import Task
+from app.schemas import TaskPriority, TaskStatus
+
+
+class TaskStruct(msgspec.Struct):
+    """Task response payload (mirrors schemas.TaskResponse)."""
+
+    id: int
+    user_id: int
+    title: str
+    description: str | None
+    status: TaskStatus
+    priority: TaskPriority
+    due_date: datetime | None
+    completed_at: datetime | None
+    created_at: datetime
+    updated_at: datetime
+
+
+class MsgspecJSONResponse(JSONResponse):
+    """JSON response encoded with msgspec (handles datetimes and enums natively)."""
+
+    def render(self, content: Any) -> bytes:
+        """Encode content to JSON bytes."""
+        return msgspec.json.encode(content)
+
+
+def task_to_struct(task: Task) -> TaskStruct:
+    """Convert a Task row to its response struct."""
+    return msgspec.convert(task, TaskStruct, from_attributes=True)
+
+
+async def stream_tasks_json(batches: AsyncIterator[Sequence[Task]]) -> AsyncIterator[bytes]:
+    """Encode batches of Task rows as one JSON array, a batch at a time."""
+    yield b"["
+    separator = b""
+    async for batch in batches:
+        # Encode the batch as an array and strip its brackets to splice it in
+        yield separator + msgspec.json.encode([task_to_struct(task) for task in batch])[1:-1]
+        separator = b","
+    yield b"]"
@@ -1,18 +1,41 @@
 """Security and authentication utilities."""
 
-from datetime import datetime, timedelta
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from functools import lru_cache
+from typing import TypeVar
 
+import anyio
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 from app.config import settings
-from app.schemas import TokenData
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# New hashes use argon2id; bcrypt is kept so existing hashes still verify.
+# Each argon2 hash needs memory_cost KiB (19 MiB) while it runs.
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated="auto",
+    argon2__memory_cost=19456,
+    argon2__time_cost=2,
+    argon2__parallelism=1,
+)
 security = HTTPBearer()
 
+T = TypeVar("T")
+
+
+@dataclass(frozen=True, slots=True)
+class CurrentUser:
+    """Authenticated user resolved from the token claims (no database lookup)."""
+
+    id: int
+    username: str
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify password against hash."""
@@ -24,20 +47,44 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+@lru_cache(maxsize=1)
+def password_hash_limiter() -> anyio.CapacityLimiter:
+    """Limiter bounding concurrent hashes (created lazily, it needs an event loop)."""
+    return anyio.CapacityLimiter(settings.password_hash_concurrency)
+
+
+async def run_password_hashing(func: Callable[..., T], *args) -> T:
+    """Run a hashing function in a worker thread, a few at a time."""
+    return await anyio.to_thread.run_sync(func, *args, limiter=password_hash_limiter())
+
+
 def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
     """Create JWT access token."""
     to_encode = data.copy()
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        expire = datetime.now(UTC) + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(minutes=settings.access_token_expire_minutes)
+        expire = datetime.now(UTC) + timedelta(minutes=settings.access_token_expire_minutes)
 
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
     return encoded_jwt
 
 
-async def get_current_user(credentials=Depends(security)) -> TokenData:
+@lru_cache(maxsize=4096)
+def decode_access_token(token: str) -> tuple[CurrentUser, int]:
+    """Verify a JWT and return its user and expiry; results are cached per token."""
+    payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+    username = payload.get("sub")
+    user_id = payload.get("uid")
+    expires_at = payload.get("exp")
+    if username is None or not isinstance(user_id, int) or not isinstance(expires_at, int):
+        raise JWTError("Token is missing required claims")
+
+    return CurrentUser(id=user_id, username=username), expires_at
+
+
+async def get_current_user(credentials=Depends(security)) -> CurrentUser:
     """Get current user from token."""
     credential_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -46,14 +93,12 @@ async def get_current_user(credentials=Depends(security)) -> TokenData:
     )
 
     try:
-        payload = jwt.decode(
-            credentials.credentials, settings.secret_key, algorithms=[settings.algorithm]
-        )
-        username: str = payload.get("sub")
-        if username is None:
-            raise credential_exception
-        token_data = TokenData(username=username)
+        current_user, expires_at = decode_access_token(credentials.credentials)
     except JWTError as err:
         raise credential_exception from err
 
-    return token_data
+    # A cached decode does not re-check expiry, so do it on every request
+    if expires_at <= time.time():
+        raise credential_exception
+
+    return current_user
@@ -6,47 +6,100 @@ import os
 os.environ["TESTING"] = "1"
 os.environ["DATABASE_URL"] = "sqlite:///./test.db"
 
-from collections.abc import Generator  # noqa: E402
+import asyncio  # noqa: E402
+from collections.abc import AsyncGenerator, Generator  # noqa: E402
 
 import pytest  # noqa: E402
-from fastapi.testclient import TestClient  # noqa: E402
-from sqlalchemy import create_engine  # noqa: E402
-from sqlalchemy.orm import Session, sessionmaker  # noqa: E402
+from httpx import ASGITransport, AsyncClient  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+from sqlalchemy.ext.asyncio import (  # noqa: E402
+    AsyncConnection,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import StaticPool  # noqa: E402
 
 from app.database import Base, get_db  # noqa: E402
 from app.main import app  # noqa: E402
 
-# Use SQLite for tests
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+# Use in-memory SQLite for tests; StaticPool shares its single connection
+SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite://"
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+engine = create_async_engine(
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
 
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+@event.listens_for(engine.sync_engine, "connect")
+def disable_pysqlite_transactions(dbapi_connection, connection_record):
+    """Stop the SQLite driver from managing transactions so SAVEPOINTs work."""
+    dbapi_connection.isolation_level = None
+
+
+@event.listens_for(engine.sync_engine, "begin")
+def begin_sqlite_transaction(connection):
+    """Emit BEGIN ourselves now that the driver no longer does."""
+    connection.exec_driver_sql("BEGIN")
+
+
+# Commits inside a test release a SAVEPOINT instead of ending the outer transaction
+TestingSessionLocal = async_sessionmaker(
+    autoflush=False,
+    expire_on_commit=False,
+    join_transaction_mode="create_savepoint",
+)
+
+
+@pytest.fixture(scope="session")
+def event_loop() -> Generator[asyncio.AbstractEventLoop, None, None]:
+    """Share one event loop with the session-scoped database fixtures."""
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
 
-def override_get_db() -> Generator[Session, None, None]:
-    """Override get_db for tests."""
-    database = TestingSessionLocal()
-    try:
-        yield database
-    finally:
-        database.close()
+
+@pytest.fixture(scope="session", autouse=True)
+async def create_schema() -> AsyncGenerator[None, None]:
+    """Create database tables once for the whole test session."""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+    await engine.dispose()
+
+
+@pytest.fixture(scope="function")
+async def connection() -> AsyncGenerator[AsyncConnection, None]:
+    """Open a connection whose transaction is rolled back after each test."""
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
+        yield connection
+        await transaction.rollback()
 
 
 @pytest.fixture(scope="function")
-def db() -> Generator[Session, None, None]:
+async def db(connection: AsyncConnection) -> AsyncGenerator[AsyncSession, None]:
     """Create test database session."""
-    Base.metadata.create_all(bind=engine)
-    yield override_get_db().__next__()
-    Base.metadata.drop_all(bind=engine)
+    async with TestingSessionLocal(bind=connection) as database:
+        yield database
 
 
 @pytest.fixture(scope="function")
-def client(db: Session) -> Generator[TestClient, None, None]:
+async def client(connection: AsyncConnection) -> AsyncGenerator[AsyncClient, None]:
     """Create test client."""
+
+    async def override_get_db() -> AsyncGenerator[AsyncSession, None]:
+        """Override get_db for tests."""
+        async with TestingSessionLocal(bind=connection) as database:
+            yield database
+
     app.dependency_overrides[get_db] = override_get_db
-    client = TestClient(app)
-    yield client
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        yield client
     app.dependency_overrides.clear()
 
 
@@ -1,15 +1,20 @@
 """Tests for authentication endpoints."""
 
-from fastapi.testclient import TestClient
-from sqlalchemy.orm import Session
+from unittest.mock import patch
+
+from httpx import AsyncClient
+from passlib.context import CryptContext
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud
+from app.models import User
 from app.schemas import UserCreate
+from app.security import create_access_token, decode_access_token, get_password_hash
 
 
-def test_register_user(client: TestClient, test_user_data: dict):
+async def test_register_user(client: AsyncClient, test_user_data: dict):
     """Test user registration."""
-    response = client.post("/auth/register", json=test_user_data)
+    response = await client.post("/auth/register", json=test_user_data)
     assert response.status_code == 201
     data = response.json()
     assert data["username"] == test_user_data["username"]
@@ -17,40 +22,44 @@ def test_register_user(client: TestClient, test_user_data: dict):
     assert "id" in data
 
 
-def test_register_duplicate_username(client: TestClient, test_user_data: dict, db: Session):
+async def test_register_duplicate_username(
+    client: AsyncClient, test_user_data: dict, db: AsyncSession
+):
     """Test registering duplicate username."""
     # Create first user
     user_create = UserCreate(**test_user_data)
-    crud.create_user(db, user_create)
+    await crud.create_user(db, user_create)
 
     # Try to create duplicate
-    response = client.post("/auth/register", json=test_user_data)
+    response = await client.post("/auth/register", json=test_user_data)
     assert response.status_code == 400
     assert "Username already registered" in response.json()["detail"]
 
 
-def test_register_duplicate_email(client: TestClient, test_user_data: dict, db: Session):
+async def test_register_duplicate_email(
+    client: AsyncClient, test_user_data: dict, db: AsyncSession
+):
     """Test registering duplicate email."""
     # Create first user
     user_create = UserCreate(**test_user_data)
-    crud.create_user(db, user_create)
+    await crud.create_user(db, user_create)
 
     # Try to create user with same email but different username
     duplicate_data = test_user_data.copy()
     duplicate_data["username"] = "differentuser"
-    response = client.post("/auth/register", json=duplicate_data)
+    response = await client.post("/auth/register", json=duplicate_data)
     assert response.status_code == 400
     assert "Email already registered" in response.json()["detail"]
 
 
-def test_login_success(client: TestClient, test_user_data: dict, db: Session):
+async def test_login_success(client: AsyncClient, test_user_data: dict, db: AsyncSession):
     """Test successful login."""
     # Create user
     user_create = UserCreate(**test_user_data)
-    crud.create_user(db, user_create)
+    await crud.create_user(db, user_create)
 
     # Login
-    response = client.post(
+    response = await client.post(
         "/auth/login",
         params={
             "username": test_user_data["username"],
@@ -63,14 +72,16 @@ def test_login_success(client: TestClient, test_user_data: dict, db: Session):
     assert data["token_type"] == "bearer"
 
 
-def test_login_invalid_credentials(client: TestClient, test_user_data: dict, db: Session):
+async def test_login_invalid_credentials(
+    client: AsyncClient, test_user_data: dict, db: AsyncSession
+):
     """Test login with invalid credentials."""
     # Create user
     user_create = UserCreate(**test_user_data)
-    crud.create_user(db, user_create)
+    await crud.create_user(db, user_create)
 
     # Try to login with wrong password
-    response = client.post(
+    response = await client.post(
         "/auth/login",
         params={
             "username": test_user_data["username"],
@@ -81,9 +92,9 @@ def test_login_invalid_credentials(client: TestClient, test_user_data: dict, db:
     assert "Incorrect username or password" in response.json()["detail"]
 
 
-def test_login_nonexistent_user(client: TestClient):
+async def test_login_nonexistent_user(client: AsyncClient):
     """Test login with nonexistent user."""
-    response = client.post(
+    response = await client.post(
         "/auth/login",
         params={
             "username": "nonexistent",
@@ -91,3 +102,50 @@ def test_login_nonexistent_user(client: TestClient):
         },
     )
     assert response.status_code == 401
+
+
+async def test_token_without_user_id_rejected(client: AsyncClient):
+    """Test that a token missing the user id claim is rejected."""
+    token = create_access_token(data={"sub": "testuser"})
+    response = await client.get("/users/me", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 401
+
+
+async def test_login_with_legacy_bcrypt_hash(
+    client: AsyncClient, test_user_data: dict, db: AsyncSession
+):
+    """Test that users with bcrypt password hashes can still log in."""
+    bcrypt_context = CryptContext(schemes=["bcrypt"])
+    db.add(
+        User(
+            username=test_user_data["username"],
+            email=test_user_data["email"],
+            hashed_password=bcrypt_context.hash(test_user_data["password"]),
+        )
+    )
+    await db.commit()
+
+    response = await client.post(
+        "/auth/login",
+        params={
+            "username": test_user_data["username"],
+            "password": test_user_data["password"],
+        },
+    )
+    assert response.status_code == 200
+
+
+def test_password_hash_uses_bounded_argon2_cost():
+    """Test that new hashes use argon2id with the configured memory cost."""
+    hashed = get_password_hash("testpassword123")
+    assert hashed.startswith("$argon2id$")
+    assert "m=19456,t=2,p=1" in hashed
+
+
+async def test_expired_token_rejected(client: AsyncClient):
+    """Test that an expired token is rejected even after a cached decode."""
+    token = create_access_token(data={"sub": "testuser", "uid": 1})
+    _, expires_at = decode_access_token(token)
+    with patch("app.security.time.time", return_value=expires_at + 1):
+        response = await client.get("/users/me", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 401
@@ -1,20 +1,20 @@
 """Tests for health and version endpoints."""
 
-from fastapi.testclient import TestClient
+from httpx import AsyncClient
 
 
-def test_health_check(client: TestClient):
+async def test_health_check(client: AsyncClient):
     """Test health check endpoint."""
-    response = client.get("/health")
+    response = await client.get("/health")
     assert response.status_code == 200
     data = response.json()
     assert data["status"] == "healthy"
     assert "timestamp" in data
 
 
-def test_version(client: TestClient):
+async def test_version(client: AsyncClient):
     """Test version endpoint."""
-    response = client.get("/version")
+    response = await client.get("/version")
     assert response.status_code == 200
     data = response.json()
     assert "version" in data
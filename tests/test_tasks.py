@@ -1,23 +1,30 @@
 """Tests for task endpoints."""
 
+import json
+
 import pytest
-from fastapi.testclient import TestClient
-from sqlalchemy.orm import Session
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
 from app import crud
+from app.models import User
+from app.responses import stream_tasks_json
 from app.schemas import UserCreate
 
 
-def create_test_user_and_get_token(
-    client: TestClient, db: Session, user_data: dict
+async def create_test_user_and_get_token(
+    client: AsyncClient, db: AsyncSession, user_data: dict
 ) -> tuple[str, int]:
     """Helper to create user and get auth token."""
     # Create user
     user_create = UserCreate(**user_data)
-    user = crud.create_user(db, user_create)
+    user = await crud.create_user(db, user_create)
 
     # Login
-    response = client.post(
+    response = await client.post(
         "/auth/login",
         params={
             "username": user_data["username"],
@@ -29,15 +36,15 @@ def create_test_user_and_get_token(
 
 
 @pytest.fixture
-def auth_token(client: TestClient, db: Session, test_user_data: dict):
+async def auth_token(client: AsyncClient, db: AsyncSession, test_user_data: dict):
     """Get authenticated token."""
-    token, user_id = create_test_user_and_get_token(client, db, test_user_data)
+    token, user_id = await create_test_user_and_get_token(client, db, test_user_data)
     return {"Authorization": f"Bearer {token}"}
 
 
-def test_create_task(client: TestClient, auth_token: dict, test_task_data: dict):
+async def test_create_task(client: AsyncClient, auth_token: dict, test_task_data: dict):
     """Test creating a task."""
-    response = client.post(
+    response = await client.post(
         "/tasks",
         json=test_task_data,
         headers=auth_token,
@@ -49,78 +56,82 @@ def test_create_task(client: TestClient, auth_token: dict, test_task_data: dict)
     assert "id" in data
 
 
-def test_create_task_unauthorized(client: TestClient, test_task_data: dict):
+async def test_create_task_unauthorized(client: AsyncClient, test_task_data: dict):
     """Test creating task without authentication."""
-    response = client.post("/tasks", json=test_task_data)
+    response = await client.post("/tasks", json=test_task_data)
     assert response.status_code == 403
 
 
-def test_list_tasks_empty(client: TestClient, auth_token: dict):
+async def test_list_tasks_empty(client: AsyncClient, auth_token: dict):
     """Test listing empty tasks."""
-    response = client.get("/tasks", headers=auth_token)
+    response = await client.get("/tasks", headers=auth_token)
     assert response.status_code == 200
     assert response.json() == []
 
 
-def test_list_tasks(
-    client: TestClient, db: Session, auth_token: dict, test_user_data: dict, test_task_data: dict
+async def test_list_tasks(
+    client: AsyncClient,
+    db: AsyncSession,
+    auth_token: dict,
+    test_user_data: dict,
+    test_task_data: dict,
 ):
     """Test listing tasks."""
     # Create tasks
-    response = client.post("/tasks", json=test_task_data, headers=auth_token)
+    response = await client.post("/tasks", json=test_task_data, headers=auth_token)
     assert response.status_code == 201
 
     # List tasks
-    response = client.get("/tasks", headers=auth_token)
+    response = await client.get("/tasks", headers=auth_token)
     assert response.status_code == 200
     data = response.json()
     assert len(data) == 1
     assert data[0]["title"] == test_task_data["title"]
 
 
-def test_list_tasks_by_status(client: TestClient, auth_token: dict, test_task_data: dict):
+async def test_list_tasks_by_status(client: AsyncClient, auth_token: dict, test_task_data: dict):
     """Test filtering tasks by status."""
     # Create task
-    response = client.post("/tasks", json=test_task_data, headers=auth_token)
+    response = await client.post("/tasks", json=test_task_data, headers=auth_token)
     assert response.status_code == 201
 
     # List todos
-    response = client.get("/tasks?status=todo", headers=auth_token)
+    response = await client.get("/tasks?status=todo", headers=auth_token)
     assert response.status_code == 200
     data = response.json()
     assert len(data) == 1
 
     # List completed
-    response = client.get("/tasks?status=completed", headers=auth_token)
+    response = await client.get("/tasks?status=completed", headers=auth_token)
     assert response.status_code == 200
     data = response.json()
     assert len(data) == 0
 
 
-def test_get_task(client: TestClient, auth_token: dict, test_task_data: dict):
+async def test_get_task(client: AsyncClient, auth_token: dict, test_task_data: dict):
     """Test getting a specific task."""
     # Create task
-    response = client.post("/tasks", json=test_task_data, headers=auth_token)
+    response = await client.post("/tasks", json=test_task_data, headers=auth_token)
     task_id = response.json()["id"]
 
     # Get task
-    response = client.get(f"/tasks/{task_id}", headers=auth_token)
+    response = await client.get(f"/tasks/{task_id}", headers=auth_token)
     assert response.status_code == 200
     data = response.json()
     assert data["id"] == task_id
     assert data["title"] == test_task_data["title"]
 
 
-def test_get_nonexistent_task(client: TestClient, auth_token: dict):
+async def test_get_nonexistent_task(client: AsyncClient, auth_token: dict):
     """Test getting nonexistent task."""
-    response = client.get("/tasks/999", headers=auth_token)
+    response = await client.get("/tasks/999", headers=auth_token)
     assert response.status_code == 404
 
 
-def test_update_task(client: TestClient, auth_token: dict, test_task_data: dict):
+async def test_update_task(client: AsyncClient, auth_token: dict, test_task_data: dict):
     """Test updating a task."""
     # Create task
-    response = client.post("/tasks", json=test_task_data, headers=auth_token)
+    response = await client.post("/tasks", json=test_task_data, headers=auth_token)
     task_id = response.json()["id"]
 
     # Update task
@@ -128,7 +139,7 @@ def test_update_task(client: TestClient, auth_token: dict, test_task_data: dict)
         "title": "Updated Task",
         "status": "in_progress",
     }
-    response = client.put(
+    response = await client.put(
         f"/tasks/{task_id}",
         json=update_data,
         headers=auth_token,
@@ -139,15 +150,29 @@ def test_update_task(client: TestClient, auth_token: dict, test_task_data: dict)
     assert data["status"] == "in_progress"
 
 
-def test_complete_task(client: TestClient, auth_token: dict, test_task_data: dict):
+async def test_task_writes_encoded_like_reads(
+    client: AsyncClient, auth_token: dict, test_task_data: dict
+):
+    """Test that create and update responses are encoded exactly like a GET."""
+    created = await client.post("/tasks", json=test_task_data, headers=auth_token)
+    task_id = created.json()["id"]
+    fetched = await client.get(f"/tasks/{task_id}", headers=auth_token)
+    assert created.content == fetched.content
+
+    updated = await client.put(f"/tasks/{task_id}", json={"title": "Renamed"}, headers=auth_token)
+    fetched = await client.get(f"/tasks/{task_id}", headers=auth_token)
+    assert updated.content == fetched.content
+
+
+async def test_complete_task(client: AsyncClient, auth_token: dict, test_task_data: dict):
     """Test marking task as completed."""
     # Create task
-    response = client.post("/tasks", json=test_task_data, headers=auth_token)
+    response = await client.post("/tasks", json=test_task_data, headers=auth_token)
     task_id = response.json()["id"]
 
     # Mark as completed
     update_data = {"status": "completed"}
-    response = client.put(
+    response = await client.put(
         f"/tasks/{task_id}",
         json=update_data,
         headers=auth_token,
@@ -158,47 +183,108 @@ def test_complete_task(client: TestClient, auth_token: dict, test_task_data: dic
     assert data["completed_at"] is not None
 
 
-def test_delete_task(client: TestClient, auth_token: dict, test_task_data: dict):
+async def test_delete_task(client: AsyncClient, auth_token: dict, test_task_data: dict):
     """Test deleting a task."""
     # Create task
-    response = client.post("/tasks", json=test_task_data, headers=auth_token)
+    response = await client.post("/tasks", json=test_task_data, headers=auth_token)
     task_id = response.json()["id"]
 
     # Delete task
-    response = client.delete(f"/tasks/{task_id}", headers=auth_token)
+    response = await client.delete(f"/tasks/{task_id}", headers=auth_token)
     assert response.status_code == 204
 
     # Verify deletion
-    response = client.get(f"/tasks/{task_id}", headers=auth_token)
+    response = await client.get(f"/tasks/{task_id}", headers=auth_token)
     assert response.status_code == 404
 
 
-def test_delete_nonexistent_task(client: TestClient, auth_token: dict):
+async def test_delete_nonexistent_task(client: AsyncClient, auth_token: dict):
     """Test deleting nonexistent task."""
-    response = client.delete("/tasks/999", headers=auth_token)
+    response = await client.delete("/tasks/999", headers=auth_token)
     assert response.status_code == 404
 
 
-def test_task_summary(client: TestClient, auth_token: dict, test_task_data: dict):
+async def test_task_summary(client: AsyncClient, auth_token: dict, test_task_data: dict):
     """Test task summary endpoint."""
     # Create multiple tasks with different statuses
-    response = client.post("/tasks", json=test_task_data, headers=auth_token)
+    response = await client.post("/tasks", json=test_task_data, headers=auth_token)
     task_id_1 = response.json()["id"]
 
-    response = client.post("/tasks", json=test_task_data, headers=auth_token)
+    response = await client.post("/tasks", json=test_task_data, headers=auth_token)
     assert response.status_code == 201
 
     # Mark one as completed
-    client.put(
+    await client.put(
         f"/tasks/{task_id_1}",
         json={"status": "completed"},
         headers=auth_token,
     )
 
     # Get summary
-    response = client.get("/tasks/summary/stats", headers=auth_token)
+    response = await client.get("/tasks/summary/stats", headers=auth_token)
     assert response.status_code == 200
     data = response.json()
     assert data["total_tasks"] == 2
     assert data["completed_tasks"] == 1
     assert data["todo_tasks"] == 1
+
+
+async def test_get_other_users_task(
+    client: AsyncClient, db: AsyncSession, auth_token: dict, test_task_data: dict
+):
+    """Test that another user's task is reported as not found."""
+    response = await client.post("/tasks", json=test_task_data, headers=auth_token)
+    task_id = response.json()["id"]
+
+    other_token, _ = await create_test_user_and_get_token(
+        client,
+        db,
+        {"username": "otheruser", "email": "other@example.com", "password": "otherpassword123"},
+    )
+    other_headers = {"Authorization": f"Bearer {other_token}"}
+
+    response = await client.get(f"/tasks/{task_id}", headers=other_headers)
+    assert response.status_code == 404
+
+    response = await client.delete(f"/tasks/{task_id}", headers=other_headers)
+    assert response.status_code == 404
+
+
+async def test_user_tasks_require_eager_loading(
+    client: AsyncClient, db: AsyncSession, test_user_data: dict, test_task_data: dict
+):
+    """Test that user.tasks raises unless loaded explicitly."""
+    token, user_id = await create_test_user_and_get_token(client, db, test_user_data)
+    headers = {"Authorization": f"Bearer {token}"}
+    response = await client.post("/tasks", json=test_task_data, headers=headers)
+    assert response.status_code == 201
+
+    user = await db.get(User, user_id)
+    with pytest.raises(InvalidRequestError):
+        _ = user.tasks
+
+    db.expunge_all()
+    user = await db.scalar(select(User).where(User.id == user_id).options(selectinload(User.tasks)))
+    assert len(user.tasks) == 1
+
+
+async def test_list_tasks_streamed_in_batches(
+    client: AsyncClient, db: AsyncSession, test_user_data: dict, test_task_data: dict
+):
+    """Test that tasks streamed across several batches form one JSON array."""
+    token, user_id = await create_test_user_and_get_token(client, db, test_user_data)
+    headers = {"Authorization": f"Bearer {token}"}
+    for _ in range(5):
+        response = await client.post("/tasks", json=test_task_data, headers=headers)
+        assert response.status_code == 201
+
+    batches = crud.stream_user_tasks(db, user_id, batch_size=2)
+    chunks = [chunk async for chunk in stream_tasks_json(batches)]
+    # Opening bracket, batches of 2 + 2 + 1 rows, closing bracket
+    assert len(chunks) == 5
+    assert len(json.loads(b"".join(chunks))) == 5
+
+    response = await client.get("/tasks", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert len(response.json()) == 5